@@ -2,12 +2,32 @@
 In this module, we define schemas and acsets.
 """
 
+import builtins
 import json
 import os
+from array import array
+from bisect import insort
+from copy import deepcopy
+from functools import lru_cache
+from itertools import chain, compress, repeat
+from math import isfinite
+from operator import eq
 from pathlib import Path
-from typing import Any, Mapping, Optional, Union
+from sys import intern
+from typing import Any, Iterable, Mapping, MutableSequence, Optional, Union
 
-from pydantic import BaseModel, Field, create_model, validator
+from pydantic import BaseModel, Field, PrivateAttr, create_model, validator
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# Encode values that JSON has no type for, such as sets and bytes, the way pydantic does
+if hasattr(BaseModel, "model_dump"):
+    from pydantic_core import to_jsonable_python as _json_default
+else:  # pragma: no cover
+    from pydantic.json import pydantic_encoder as _json_default
 
 HERE = Path(__file__).parent.resolve()
 SCHEMAS_DIRECTORY = HERE.joinpath("schemas")
@@ -15,11 +35,113 @@ CATLAB_SCHEMAS_DIRECTORY = SCHEMAS_DIRECTORY.joinpath("catlab")
 JSON_SCHEMAS_DIRECTORY = SCHEMAS_DIRECTORY.joinpath("jsonschema")
 
 
+# Maps every digit to "0", so that an integer literal too long to be sure it fits in
+# 64 bits, which orjson would read as a float, shows up as a run of 19 zeros
+_DIGITS_TO_ZERO = bytes.maketrans(b"123456789", b"000000000")
+
+
+def _orjson_safe(x) -> bool:
+    """Check that :mod:`orjson` writes a JSON value the same way as :func:`json.dumps`.
+
+    :mod:`orjson` writes NaN and infinite floats as ``null`` and rejects integers beyond
+    64 bits, so values holding these have to be written by :func:`json.dumps`.
+    """
+    if type(x) is float:
+        return isfinite(x)
+    if type(x) is int:
+        return -(2**63) <= x < 2**64
+    if isinstance(x, dict):
+        return all(map(_orjson_safe, x.values()))
+    if isinstance(x, (list, tuple, set, frozenset)):
+        return all(map(_orjson_safe, x))
+    return True
+
+
+def _json_dumps(obj, safe: Optional[bool] = None) -> str:
+    """Serialize a JSON object to a compact string, with :mod:`orjson` if it is installed.
+
+    Args:
+        obj: The JSON object to serialize.
+        safe: Whether the object is already known to pass :func:`_orjson_safe`. By
+            default, the whole object is checked.
+
+    Returns:
+        The JSON string.
+    """
+    if orjson is not None and (_orjson_safe(obj) if safe is None else safe):
+        try:
+            return orjson.dumps(obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass
+    return json.dumps(obj, default=_json_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def _json_loads(s: Union[str, bytes]):
+    """Parse a JSON string, with :mod:`orjson` if it is installed.
+
+    Strings with NaN or infinite floats, which :mod:`orjson` rejects, or with integers
+    that may not fit in 64 bits are parsed by :func:`json.loads` instead.
+    """
+    if orjson is not None:
+        b = s.encode() if isinstance(s, str) else s
+        if b"0" * 19 not in b.translate(_DIGITS_TO_ZERO):
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                pass
+    return json.loads(s)
+
+
+def _constructor(model: type[BaseModel]):
+    """Get the method that instantiates a pydantic model from trusted values, skipping validation."""
+    return model.model_construct if hasattr(model, "model_construct") else model.construct
+
+
 class HashableBaseModel(BaseModel):
-    """An extension of BaseModel with an implementation of __hash__"""
+    """An extension of BaseModel with an implementation of __hash__
+
+    The hash is computed on first use and cached in a private attribute, which is
+    cleared whenever a field is set, the model is copied, or it is unpickled in another
+    process. Equality compares field values only, ignoring that cache.
+    """
+
+    _hash: Optional[int] = PrivateAttr(default=None)
 
     def __hash__(self):
-        return hash((type(self),) + tuple(self.__dict__.values()))
+        if self._hash is None:
+            self._hash = hash((type(self),) + tuple(self.__dict__.values()))
+        return self._hash
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name != "_hash":
+            self._hash = None
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._hash = None
+
+    def copy(self, *args, **kwargs):
+        m = super().copy(*args, **kwargs)
+        m._hash = None
+        return m
+
+    if hasattr(BaseModel, "model_copy"):
+
+        def model_copy(self, *args, **kwargs):
+            m = super().model_copy(*args, **kwargs)
+            m._hash = None
+            return m
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.__dict__ == other.__dict__
+
+    @validator("name", "dom", "codom", check_fields=False)
+    def intern_name(cls, name: str):
+        """Intern names, since they are used as keys when looking up schema elements."""
+        return intern(str(name))
 
 
 class Ob(HashableBaseModel):
@@ -96,14 +218,18 @@ class Hom(HashableBaseModel):
         allow_mutation = False
 
 
-def _look_up_type(s: str) -> type:
-    """Look up the appropriate type from a string."""
-    import builtins
+#: The builtin types, keyed by name
+_BUILTIN_TYPES: dict[str, type] = {
+    name: value for name, value in vars(builtins).items() if isinstance(value, type)
+}
 
-    if hasattr(builtins, s):
-        return getattr(builtins, s)
 
-    raise NotImplementedError("non-builtin data types are not yet implemented")
+def _look_up_type(s: str) -> type:
+    """Look up the appropriate type from a string."""
+    ty = _BUILTIN_TYPES.get(s)
+    if ty is None:
+        raise NotImplementedError("non-builtin data types are not yet implemented")
+    return ty
 
 
 class AttrType(HashableBaseModel):
@@ -217,10 +343,10 @@ class CatlabSchema(HashableBaseModel):
     the user should use the Schema class, which is below.
     """
 
-    Ob: list[Ob]
-    Hom: list[Hom]
-    AttrType: list[AttrType]
-    Attr: list[Attr]
+    Ob: tuple[Ob, ...]
+    Hom: tuple[Hom, ...]
+    AttrType: tuple[AttrType, ...]
+    Attr: tuple[Attr, ...]
     version: VersionSpec = Field(default=VERSION_SPEC)
 
     class Config:
@@ -232,16 +358,77 @@ class CatlabSchema(HashableBaseModel):
         }
 
 
+@lru_cache(maxsize=256)
+def _make_models(
+    name: str,
+    obs: tuple[Ob, ...],
+    homs: tuple[Hom, ...],
+    attrtypes: tuple[AttrType, ...],
+    attrs: tuple[Attr, ...],
+) -> tuple[type[BaseModel], dict[Ob, type[BaseModel]]]:
+    """Make the pydantic models for serializing acsets with a given schema.
+
+    The models are cached on the schema's name and elements, so that they are shared
+    by every schema with the same signature.
+
+    Args:
+        name: The name of the schema.
+        obs: The objects of the schema.
+        homs: The morphisms of the schema.
+        attrtypes: The attribute types of the schema.
+        attrs: The attributes of the schema.
+
+    Returns:
+        The model for a whole acset and a dictionary with the model for the parts of
+        each object.
+    """
+    attrtype_ty = {at.name: at.ty for at in attrtypes}
+    ob_models = {
+        ob: create_model(
+            ob.name,
+            id_field_internal=(int, Field(alias="_id")),
+            **{f.name: (Union[int, None], None) for f in homs if f.dom == ob.name},
+            **{
+                f.name: (Union[attrtype_ty[f.codom], None], None)
+                for f in attrs
+                if f.dom == ob.name
+            },
+        )
+        for ob in obs
+    }
+    model = create_model(
+        name, **{ob.name: (list[ob_models[ob]], ...) for ob in obs}  # type: ignore
+    )
+    return model, ob_models
+
+
 class Schema:
     """
     This is a schema for an acset. Every acset needs a schema, to restrict the allowed
     operations to ensure consistency.
     """
 
+    __slots__ = (
+        "name",
+        "schema",
+        "_models",
+        "_by_name",
+        "_name_to_ob",
+        "_attrtype_ty",
+        "_homs_outof",
+        "_attrs_outof",
+        "_props_outof",
+    )
+
     name: str
     schema: CatlabSchema
-    model: type[BaseModel]
-    ob_models: dict[Ob, type[BaseModel]]
+    _models: Optional[tuple[type[BaseModel], dict[Ob, type[BaseModel]]]]
+    _by_name: dict[str, Union[Ob, Hom, AttrType, Attr]]
+    _name_to_ob: dict[str, Ob]
+    _attrtype_ty: dict[str, type]
+    _homs_outof: dict[str, tuple[Hom, ...]]
+    _attrs_outof: dict[str, tuple[Attr, ...]]
+    _props_outof: dict[str, tuple[Property, ...]]
 
     def __init__(
         self,
@@ -259,26 +446,59 @@ class Schema:
             homs: A list of morphisms (`Hom`).
             attrtypes: A list of attribute types (`AttrType`).
             attrs: A list of attributes (`Attr`).
+
+        Raises:
+            ValueError: If two morphisms or attributes have the same name.
         """
+        names = set()
+        for f in chain(homs, attrs):
+            if f.name in names:
+                raise ValueError(f"schema {name} has more than one property named {f.name}")
+            names.add(f.name)
         self.name = name
-        self.schema = CatlabSchema(
-            version=VERSION_SPEC, Ob=obs, Hom=homs, AttrType=attrtypes, Attr=attrs
+        # The elements are already validated models, so skip validating them again
+        self.schema = _constructor(CatlabSchema)(
+            version=VERSION_SPEC,
+            Ob=tuple(obs),
+            Hom=tuple(homs),
+            AttrType=tuple(attrtypes),
+            Attr=tuple(attrs),
         )
-        ob_models = {
-            ob: create_model(
-                ob.name,
-                id_field_internal=(int, Field(alias="_id")),
-                **{
-                    prop.name: (Union[self.valtype(prop), None], None)
-                    for prop in self.props_outof(ob)
-                },
-            )
-            for ob in obs
+        # Later entries win, so that objects shadow morphisms, which shadow
+        # attribute types, which shadow attributes
+        self._by_name = {
+            x.name: x for x in chain(self.attrs, self.attrtypes, self.homs, self.obs)
         }
-        self.ob_models = ob_models
-        self.model = create_model(
-            self.name, **{ob.name: (list[ob_models[ob]], ...) for ob in self.obs}  # type: ignore
-        )
+        self._name_to_ob = {ob.name: ob for ob in self.obs}
+        self._attrtype_ty = {at.name: at.ty for at in self.attrtypes}
+        self._homs_outof = {
+            ob.name: tuple(f for f in self.homs if f.dom == ob.name) for ob in self.obs
+        }
+        self._attrs_outof = {
+            ob.name: tuple(f for f in self.attrs if f.dom == ob.name) for ob in self.obs
+        }
+        self._props_outof = {
+            ob.name: self._homs_outof[ob.name] + self._attrs_outof[ob.name] for ob in self.obs
+        }
+        # The pydantic models are only needed for (de)serialization, so they are made on
+        # first use
+        self._models = None
+
+    def _get_models(self) -> tuple[type[BaseModel], dict[Ob, type[BaseModel]]]:
+        """Get the pydantic models for this schema, making them if necessary."""
+        if self._models is None:
+            self._models = _make_models(self.name, self.obs, self.homs, self.attrtypes, self.attrs)
+        return self._models
+
+    @property
+    def model(self) -> type[BaseModel]:
+        """Get the pydantic model for a whole acset with this schema."""
+        return self._get_models()[0]
+
+    @property
+    def ob_models(self) -> dict[Ob, type[BaseModel]]:
+        """Get the pydantic models for the parts of each object in this schema."""
+        return self._get_models()[1]
 
     def valtype(self, prop: Property):
         """Resolve the python type of a given property
@@ -289,11 +509,7 @@ class Schema:
         Returns:
             The Property value type
         """
-        return (
-            int
-            if isinstance(prop, Hom)
-            else next(at for at in self.schema.AttrType if at.name == prop.codom).ty
-        )
+        return int if isinstance(prop, Hom) else self._attrtype_ty[prop.codom]
 
     def valid_value(self, prop: Property, val):
         """Verify if a given value is valid for a given property
@@ -326,7 +542,9 @@ class Schema:
             :func:`json.dump`.
         """
         # TODO add description
-        schema = self.model.schema()
+        # Models are shared between equal schemas and pydantic caches the dictionary it
+        # returns, so copy it before changing it
+        schema = deepcopy(self.model.schema())
         for part in schema["definitions"].values():
             part["additionalProperties"] = False
         schema["$schema"] = "http://json-schema.org/draft-07/schema#"
@@ -339,18 +557,23 @@ class Schema:
         path,
         uri: Optional[str] = None,
     ) -> None:
-        """Write a JSON schema to a file path."""
+        """Write a JSON schema to a file path, unless it already has the same contents."""
         schema = self.make_schema(uri=uri)
-        schema_str = json.dumps(schema, indent=2, ensure_ascii=False, sort_keys=True)
+        if orjson is not None:
+            data = orjson.dumps(schema, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+        else:
+            data = json.dumps(schema, indent=2, ensure_ascii=False, sort_keys=True).encode()
         path = Path(path).expanduser().resolve()
-        path.write_text(schema_str)
+        # Leave unchanged files alone, so regenerating schemas doesn't touch them
+        if not path.is_file() or path.read_bytes() != data:
+            path.write_bytes(data)
 
     @property
     def obs(self):
         """Get the objects of the schema
 
         Returns:
-            A list of of `Ob`\s
+            A tuple of `Ob`\s
         """
         return self.schema.Ob
 
@@ -359,7 +582,7 @@ class Schema:
         """Get the morphisms of the schema
 
         Returns:
-            A list of of `Hom`\s
+            A tuple of `Hom`\s
         """
         return self.schema.Hom
 
@@ -368,7 +591,7 @@ class Schema:
         """Get the attribute types of the schema
 
         Returns:
-            A list of of `AttrType`\s
+            A tuple of `AttrType`\s
         """
         return self.schema.AttrType
 
@@ -377,42 +600,42 @@ class Schema:
         """Get the attributes of the schema
 
         Returns:
-            A list of of `Attr`\s
+            A tuple of `Attr`\s
         """
         return self.schema.Attr
 
-    def props_outof(self, ob: Ob) -> list[Property]:
+    def props_outof(self, ob: Ob) -> tuple[Property, ...]:
         """Get all of the properties with the domain of `ob` in the schema.
 
         Args:
             ob: An `Ob` object that is in the schema.
 
         Returns:
-            A list of `Hom` and `Attr` objects where `ob` is in the domain of the properties.
+            A tuple of `Hom` and `Attr` objects where `ob` is in the domain of the properties.
         """
-        return list(filter(lambda f: f.dom == ob.name, self.homs + self.attrs))
+        return self._props_outof[ob.name]
 
-    def homs_outof(self, ob: Ob) -> list[Property]:
+    def homs_outof(self, ob: Ob) -> tuple[Hom, ...]:
         """Get all of the morphisms that the given object `ob` maps to in the schema.
 
         Args:
             ob: An `Ob` object that is in the schema.
 
         Returns:
-            A list of `Hom` objects where `ob` is in the domain of the morphism.
+            A tuple of `Hom` objects where `ob` is in the domain of the morphism.
         """
-        return list(filter(lambda f: f.dom == ob.name, self.homs))
+        return self._homs_outof[ob.name]
 
-    def attrs_outof(self, ob: Ob) -> list[Property]:
+    def attrs_outof(self, ob: Ob) -> tuple[Attr, ...]:
         """Get all of the attributes that the given object `ob` maps to in the schema.
 
         Args:
             ob: An `Ob` object that is in the schema.
 
         Returns:
-            A list of `Attr` objects where `ob` is in the domain of the attribute.
+            A tuple of `Attr` objects where `ob` is in the domain of the attribute.
         """
-        return list(filter(lambda f: f.dom == ob.name, self.attrs))
+        return self._attrs_outof[ob.name]
 
     def from_string(self, s: str):
         """Get the appropriate object, morphism, attribute type, or attribute from the schema by name.
@@ -423,18 +646,11 @@ class Schema:
         Returns:
             The `Ob`/`Hom`/`AttrType`/`Attr` object that has the name `s` or `None` if no names match.
         """
-        x = next((x for x in self.obs if x.name == s), None)
-        if x != None:
-            return x
-        x = next((x for x in self.homs if x.name == s), None)
-        if x != None:
-            return x
-        x = next((x for x in self.attrtypes if x.name == s), None)
-        if x != None:
-            return x
-        x = next((x for x in self.attrs if x.name == s), None)
-        if x != None:
-            return x
+        return self._by_name.get(s)
+
+
+#: The value stored in a morphism column for a part whose subpart is unset
+_NO_PART = -1
 
 
 class ACSet:
@@ -445,12 +661,26 @@ class ACSet:
 
     One can get all of the parts corresponding to an object, add parts, get the subparts,
     and set the subparts. Removing parts is currently unsupported.
+
+    The tables are stored column-wise: each morphism is a contiguous `array` of
+    64-bit integers and each attribute is a `list`, both indexed by part and keyed
+    by the name of the property, which is unique within a schema. Unset
+    subparts hold `_NO_PART` in morphism columns and `None` in attribute columns.
+    Strings stored in attribute columns are interned, since names such as species
+    names tend to repeat.
+
+    Every morphism is also indexed: for each part of the codomain we keep the
+    sorted list of parts of the domain that map to it, so that `incident` does
+    not need to scan the morphism column.
     """
 
+    __slots__ = ("name", "schema", "_parts", "_subparts", "_index", "_name_to_ob")
+
     name: str
     schema: Schema
     _parts: dict[Ob, int]
-    _subparts: dict[Property, dict[int, Any]]
+    _subparts: dict[str, MutableSequence[Any]]
+    _index: dict[str, dict[int, list[int]]]
     _name_to_ob: Mapping[str, Ob]
 
     def __init__(self, name: str, schema: Schema):
@@ -463,8 +693,10 @@ class ACSet:
         self.name = name
         self.schema = schema
         self._parts = {ob: 0 for ob in schema.obs}
-        self._subparts = {f: {} for f in schema.homs + schema.attrs}
-        self._name_to_ob = {ob.name: ob for ob in schema.obs}
+        self._subparts = {f.name: array("q") for f in schema.homs}
+        self._subparts.update({f.name: [] for f in schema.attrs})
+        self._index = {f.name: {} for f in schema.homs}
+        self._name_to_ob = schema._name_to_ob
 
     @classmethod
     def from_obj(cls, *, name: str, obj) -> "ACSet":
@@ -509,8 +741,8 @@ class ACSet:
             sir = ACSet.from_file(name="petri", path=path)
             s, i, r = sir.add_parts("S", 3)
         """
-        with open(path) as file:
-            obj = json.load(file)
+        with open(path, "rb") as file:
+            obj = _json_loads(file.read())
         return cls.from_obj(name=name, obj=obj)
 
     def add_parts(self, ob: Union[str, Ob], n: int) -> range:
@@ -525,9 +757,13 @@ class ACSet:
         """
         if isinstance(ob, str):
             ob = self._name_to_ob[ob]
-        assert ob in self.schema.obs
+        assert ob in self._parts
         i = self._parts[ob]
-        self._parts[ob] += n
+        self._parts[ob] = i + n
+        for f in self.schema.homs_outof(ob):
+            self._subparts[f.name].extend(repeat(_NO_PART, n))
+        for f in self.schema.attrs_outof(ob):
+            self._subparts[f.name].extend(repeat(None, n))
         return range(i, i + n)
 
     def add_part(self, ob: Union[str, Ob]) -> int:
@@ -539,7 +775,16 @@ class ACSet:
         Returns:
             The index of the new part added to the object.
         """
-        return self.add_parts(ob, 1)[0]
+        if isinstance(ob, str):
+            ob = self._name_to_ob[ob]
+        assert ob in self._parts
+        i = self._parts[ob]
+        self._parts[ob] = i + 1
+        for f in self.schema.homs_outof(ob):
+            self._subparts[f.name].append(_NO_PART)
+        for f in self.schema.attrs_outof(ob):
+            self._subparts[f.name].append(None)
+        return i
 
     def set_subpart(self, i: int, f: Property, x: Any):
         """Modify a morphism or attribute for a row in a table of the ACSet.
@@ -549,12 +794,57 @@ class ACSet:
             f: The `Hom` or `Attr` to modify.
             x: A valid type for the given `Hom` or `Attr` to set the value or `None` to delete the property.
         """
-        if x is None:
-            if self.has_subpart(i, f):
-                del self._subparts[f][i]
+        self.set_subparts((i,), f, (x,))
+
+    def set_subparts(self, parts: Iterable[int], f: Property, xs: Iterable[Any]):
+        """Modify a morphism or attribute for several rows in a table of the ACSet.
+
+        This is equivalent to calling `set_subpart` on each row and value in turn,
+        but looks up the column and its index only once.
+
+        Args:
+            parts: The row indexes to modify.
+            f: The `Hom` or `Attr` to modify.
+            xs: A value for each row in `parts`, where `None` deletes the property.
+
+        Raises:
+            IndexError: If a row is not a part of the domain of `f`.
+            ValueError: If a morphism is set to a value that is not a part of its
+                codomain, or `parts` and `xs` have different lengths.
+        """
+        if hasattr(parts, "__len__") and hasattr(xs, "__len__") and len(parts) != len(xs):
+            raise ValueError(f"got {len(xs)} values for {len(parts)} parts")
+        col = self._subparts[f.name]
+        n = len(col)
+        ty = self.schema.valtype(f)
+        is_hom = isinstance(f, Hom)
+        if is_hom:
+            m = self._parts[self._name_to_ob[f.codom]]
+        if ty is str:
+            xs = (intern(x) if type(x) is str else x for x in xs)
+        # Check every value before touching the column or its index, so a bad
+        # value leaves the ACSet unchanged.
+        pairs = list(zip(parts, xs))
+        for i, x in pairs:
+            if not 0 <= i < n:
+                raise IndexError(f"{f.dom} has no part {i}")
+            assert x is None or isinstance(x, ty)
+            if is_hom and x is not None and not 0 <= x < m:
+                raise ValueError(f"{f.name} can not map part {i} to {x}, {f.codom} has {m} parts")
+        if is_hom:
+            index = self._index[f.name]
+            for i, x in pairs:
+                old = col[i]
+                if old != _NO_PART:
+                    index[old].remove(i)
+                if x is None:
+                    col[i] = _NO_PART
+                else:
+                    col[i] = x
+                    insort(index.setdefault(x, []), i)
         else:
-            assert self.schema.valid_value(f, x)
-            self._subparts[f][i] = x
+            for i, x in pairs:
+                col[i] = x
 
     def has_subpart(self, i: int, f: Property):
         """Check if a property exists for a given row in a table of the ACSset.
@@ -566,7 +856,11 @@ class ACSet:
         Returns:
             `True` if the property `f` exists on row `i` or `False` if it doesn't.
         """
-        return i in self._subparts[f].keys()
+        col = self._subparts[f.name]
+        if not 0 <= i < len(col):
+            return False
+        x = col[i]
+        return x != _NO_PART if isinstance(f, Hom) else x is not None
 
     def subpart(self, i: int, f: Property, oneindex=False):
         """Get the subpart of a part in an ACSet
@@ -578,11 +872,21 @@ class ACSet:
 
         Returns:
             The subpart of the ACset.
+
+        Raises:
+            KeyError: If the subpart has not been set.
         """
-        if oneindex and type(f) == Hom:
-            return self._subparts[f][i] + 1
-        else:
-            return self._subparts[f][i]
+        col = self._subparts[f.name]
+        if not 0 <= i < len(col):
+            raise KeyError(i)
+        x = col[i]
+        if isinstance(f, Hom):
+            if x == _NO_PART:
+                raise KeyError(i)
+            return x + 1 if oneindex else x
+        if x is None:
+            raise KeyError(i)
+        return x
 
     def nparts(self, ob: Ob) -> int:
         """Get the number of rows in a given table of the ACSet.
@@ -593,7 +897,7 @@ class ACSet:
         Returns:
             The number of rows in `ob`.
         """
-        assert ob in self.schema.obs
+        assert ob in self._parts
         return self._parts[ob]
 
     def parts(self, ob: Ob) -> range:
@@ -618,12 +922,12 @@ class ACSet:
             A list indexes.
         """
         assert self.schema.valid_value(f, x)
-        return list(
-            filter(
-                lambda i: self.subpart(i, f) == x,
-                self.parts(Ob(name=f.dom, title=None, description=None)),
-            )
-        )
+        if isinstance(f, Hom):
+            return list(self._index[f.name].get(x, ()))
+        if type(x) is str:
+            x = intern(x)
+        col = self._subparts[f.name]
+        return list(compress(range(len(col)), map(eq, col, repeat(x))))
 
     def prop_dict(self, ob: Ob, i: int) -> dict[str, Any]:
         """Get a dictionary of all subparts for a given row in a table.
@@ -635,28 +939,40 @@ class ACSet:
         Returns:
             A dictionary mapping property name to the value
         """
-        props = {
-            f.name: self.subpart(i, f, oneindex=True)
-            for f in self.schema.props_outof(ob)
-            if self.has_subpart(i, f)
-        }
+        props = {}
+        for f in self.schema.homs_outof(ob):
+            x = self._subparts[f.name][i]
+            if x != _NO_PART:
+                props[f.name] = x + 1
+        for f in self.schema.attrs_outof(ob):
+            x = self._subparts[f.name][i]
+            if x is not None:
+                props[f.name] = x
         props["_id"] = i + 1
         return props
 
     def export_pydantic(self):
         """Serialize the ACSet to a pydantic model.
 
+        The values in the ACSet were checked when they were set, so the models are
+        constructed without being validated again. Only the properties that are set on
+        a row count as set fields of its model, as with `exclude_unset`.
+
         Returns:
             The pydantic model of the serialized ACSet.
         """
-        return self.schema.model(
-            **{
-                ob.name: [
-                    self.schema.ob_models[ob](**self.prop_dict(ob, i)) for i in self.parts(ob)
-                ]
-                for ob in self.schema.obs
-            }
-        )
+        schema = self.schema
+        obj = self.to_json_obj()
+        for ob, model in schema.ob_models.items():
+            construct = _constructor(model)
+            obj[ob.name] = [
+                construct(
+                    id_field_internal=row.pop("_id"),
+                    **{k: v for k, v in row.items() if v is not None},
+                )
+                for row in obj[ob.name]
+            ]
+        return _constructor(schema.model)(**obj)
 
     @classmethod
     def import_pydantic(cls, name: str, schema: Schema, d: Any):
@@ -673,40 +989,108 @@ class ACSet:
 
         assert type(d) == schema.model
 
-        for ob in schema.obs:
-            for props in d.__dict__[ob.name]:
-                i = acs.add_part(ob)
-                for f in schema.homs_outof(ob):
-                    acs.set_subpart(i, f, props.__dict__[f.name] - 1)
-                for f in schema.attrs_outof(ob):
-                    acs.set_subpart(i, f, props.__dict__[f.name])
+        # Add every part first, so that morphisms can refer to any table
+        tables = {ob: [props.__dict__ for props in d.__dict__[ob.name]] for ob in schema.obs}
+        parts = {ob: acs.add_parts(ob, len(rows)) for ob, rows in tables.items()}
+        for ob, rows in tables.items():
+            for f in schema.homs_outof(ob):
+                xs = [row[f.name] for row in rows]
+                acs.set_subparts(parts[ob], f, [None if x is None else x - 1 for x in xs])
+            for f in schema.attrs_outof(ob):
+                acs.set_subparts(parts[ob], f, [row[f.name] for row in rows])
 
         return acs
 
     def to_json_obj(self):
         """Serialize the ACSet to a JSON object.
 
+        The object is built directly from the columns of each table, and is the same as
+        the one produced by dumping :meth:`export_pydantic` with aliases.
+
         Returns:
             The JSON object of the serialized ACSet.
         """
-        return self.export_pydantic().dict(by_alias=True)
+        schema, subparts, no_part = self.schema, self._subparts, _NO_PART
+        obj = {}
+        for ob, n in self._parts.items():
+            homs = schema.homs_outof(ob)
+            attrs = schema.attrs_outof(ob)
+            keys = ["_id", *(f.name for f in homs), *(f.name for f in attrs)]
+            cols = [
+                range(1, n + 1),
+                *([None if x == no_part else x + 1 for x in subparts[f.name]] for f in homs),
+                *(subparts[f.name] for f in attrs),
+            ]
+            obj[ob.name] = [dict(zip(keys, row)) for row in zip(*cols)]
+        return obj
+
+    @classmethod
+    def from_json_obj(cls, name: str, schema: Schema, obj: Mapping[str, Any]):
+        """Deserialize a JSON object to an ACSet with a given `Schema`.
+
+        This is the inverse of :meth:`to_json_obj`. Unlike :meth:`read_json`, the rows
+        are loaded straight into the columns of the ACSet without building pydantic
+        models, so values are checked against the types of their properties but are
+        not coerced.
+
+        Args:
+            name: The name of the ACSset.
+            schema: The `Schema` of the ACSet that is defined in the given JSON object.
+            obj: The JSON object, with a list of rows for each object in the schema.
+
+        Returns:
+            The deserialized ACSet object.
+        """
+        acs = cls(name, schema)
+        # Add every part first, so that morphisms can refer to any table
+        parts = {ob: acs.add_parts(ob, len(obj[ob.name])) for ob in schema.obs}
+        for ob in schema.obs:
+            rows = obj[ob.name]
+            for f in schema.homs_outof(ob):
+                xs = [row.get(f.name) for row in rows]
+                acs.set_subparts(parts[ob], f, [None if x is None else x - 1 for x in xs])
+            for f in schema.attrs_outof(ob):
+                acs.set_subparts(parts[ob], f, [row.get(f.name) for row in rows])
+        return acs
 
     def to_json_file(self, fname, *args, **kwargs):
         """Serialize the ACSet to a JSON file.
 
         Args:
             fname: The file name to write the JSON to.
+            args: Positional arguments passed to :meth:`to_json_str`.
+            kwargs: Keyword arguments passed to :meth:`to_json_str`.
         """
-        with open(fname, "w") as fh:
-            fh.write(self.to_json_str(*args, **kwargs, by_alias=True))
+        with open(fname, "w", encoding="utf-8") as fh:
+            fh.write(self.to_json_str(*args, **kwargs))
 
     def to_json_str(self, *args, **kwargs):
         """Serialize the ACSet to a JSON string.
 
+        The JSON is compact and written with :mod:`orjson` if it is installed. Without
+        extra arguments, it is built directly from the columns of the ACSet. Otherwise,
+        the arguments (such as `include`, `exclude` or `exclude_none`) are passed to the
+        `dict` method of :meth:`export_pydantic`, and its result is written in the same
+        format.
+
+        Args:
+            args: Positional arguments passed to the pydantic model's `dict` method.
+            kwargs: Keyword arguments passed to the pydantic model's `dict` method.
+
         Returns:
             The JSON string of the serialized ACSet.
         """
-        return self.export_pydantic().json(*args, **kwargs, by_alias=True)
+        if args or kwargs:
+            return _json_dumps(self.export_pydantic().dict(*args, **kwargs, by_alias=True))
+        # Only attributes can hold values that orjson writes differently. Strings and
+        # falsy values such as None are always safe, so they are not checked.
+        schema, subparts = self.schema, self._subparts
+        safe = all(
+            all(map(_orjson_safe, filter(None, subparts[f.name])))
+            for f in schema.attrs
+            if schema.valtype(f) is not str
+        )
+        return _json_dumps(self.to_json_obj(), safe=safe)
 
     @classmethod
     def read_json(cls, name: str, schema: Schema, s: str):
@@ -720,4 +1104,4 @@ class ACSet:
         Returns:
             The deserialized ACSet object.
         """
-        return cls.import_pydantic(name, schema, schema.model.parse_obj(json.loads(s)))
+        return cls.import_pydantic(name, schema, schema.model.parse_obj(_json_loads(s)))
@@ -2,6 +2,8 @@
 In this model, we define a schema for petri nets, and then a subclass of acset
 with some convenience methods.
 """
+from array import array
+from itertools import repeat
 from pathlib import Path
 
 from acsets import (
@@ -135,6 +137,8 @@ class Petri(ACSet):
         sir.set_subpart(inf,attr_tprop, { "uuid": "bba26d0e-3ce5-41e5-ac0e-6be35535d534" })
     """
 
+    __slots__ = ()
+
     def __init__(self, name="Petri", schema=SchPropertyLabelledReactionNet):
         """Initialize a new petri net."""
         super(Petri, self).__init__(schema.name, schema)
@@ -160,15 +164,19 @@ class Petri(ACSet):
             A range of the of the indexes of the transitions that were inserted into the petri net.
         """
         ts = self.add_parts(Transition, len(transitions))
+        # The arcs as (transition, species) pairs in coordinate format
+        in_ts, in_ss, out_ts, out_ss = array("q"), array("q"), array("q"), array("q")
         for t, (ins, outs) in zip(ts, transitions):
-            for s in ins:
-                arc = self.add_part(Input)
-                self.set_subpart(arc, hom_it, t)
-                self.set_subpart(arc, hom_is, s)
-            for s in outs:
-                arc = self.add_part(Output)
-                self.set_subpart(arc, hom_ot, t)
-                self.set_subpart(arc, hom_os, s)
+            in_ts.extend(repeat(t, len(ins)))
+            in_ss.extend(ins)
+            out_ts.extend(repeat(t, len(outs)))
+            out_ss.extend(outs)
+        in_arcs = self.add_parts(Input, len(in_ts))
+        self.set_subparts(in_arcs, hom_it, in_ts)
+        self.set_subparts(in_arcs, hom_is, in_ss)
+        out_arcs = self.add_parts(Output, len(out_ts))
+        self.set_subparts(out_arcs, hom_ot, out_ts)
+        self.set_subparts(out_arcs, hom_os, out_ss)
         return ts
 
 
@@ -184,9 +192,10 @@ if __name__ == "__main__":
         SchPropertyLabelledReactionNet,
     ]:
         schema_filename = "{}.json".format(schema.name)
-        CATLAB_SCHEMAS_DIRECTORY.joinpath(schema_filename).write_text(
-            schema.schema.json(indent=2, ensure_ascii=False, sort_keys=True)
-        )
+        catlab_path = CATLAB_SCHEMAS_DIRECTORY.joinpath(schema_filename)
+        catlab_str = schema.schema.json(indent=2, ensure_ascii=False, sort_keys=True)
+        if not catlab_path.is_file() or catlab_path.read_text(encoding="utf-8") != catlab_str:
+            catlab_path.write_text(catlab_str, encoding="utf-8")
         jsonschema_path = JSON_SCHEMAS_DIRECTORY.joinpath(schema_filename)
         schema.write_schema(
             JSON_SCHEMAS_DIRECTORY.joinpath(jsonschema_path),
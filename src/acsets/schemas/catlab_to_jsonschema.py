@@ -19,22 +19,26 @@ CATLAB = HERE.joinpath("catlab")
 JSONSCHEMA = HERE.joinpath("jsonschema")
 
 
+def _convert(catlab_path: Path) -> None:
+    """Convert a Catlab schema into a JSON schema"""
+    jsonschema_path = JSONSCHEMA.joinpath(catlab_path.name)
+    print(f"Parsing Catlab Schema from {catlab_path}")
+    catlab_schema = CatlabSchema.parse_file(catlab_path)
+    print("Getting Schema from Catlab schema")
+    schema = Schema.from_catlab(catlab_path.name, catlab_schema)
+    schema.write_schema(
+        jsonschema_path,
+        uri="https://raw.githubusercontent.com/AlgebraicJulia/py-acsets/main/src/acsets/{}".format(
+            Path(jsonschema_path).relative_to(HERE)
+        ),
+    )
+
+
 def main():
     """Convert any Catlab schemas into JSON schemas"""
     for catlab_path in CATLAB.glob("*.json"):
-        jsonschema_path = JSONSCHEMA.joinpath(catlab_path.name)
-        if jsonschema_path.is_file():
-            continue
-        print(f"Parsing Catlab Schema from {catlab_path}")
-        catlab_schema = CatlabSchema.parse_file(catlab_path)
-        print("Getting Schema from Catlab schema")
-        schema = Schema.from_catlab(catlab_path.name, catlab_schema)
-        schema.write_schema(
-            jsonschema_path,
-            uri="https://raw.githubusercontent.com/AlgebraicJulia/py-acsets/main/src/acsets/{}".format(
-                Path(jsonschema_path).relative_to(HERE)
-            ),
-        )
+        if not JSONSCHEMA.joinpath(catlab_path.name).is_file():
+            _convert(catlab_path)
 
 
 if __name__ == "__main__":
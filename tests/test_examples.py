@@ -19,6 +19,6 @@ class TestExamples(unittest.TestCase):
                 self.assertTrue(
                     jsonschema_path.is_file(), msg="No corresponding JSON schema for example"
                 )
-                jsonschema_obj = json.loads(jsonschema_path.read_text())
-                example_obj = json.loads(example.read_text())
+                jsonschema_obj = json.loads(jsonschema_path.read_bytes())
+                example_obj = json.loads(example.read_bytes())
                 jsonschema.validate(instance=example_obj, schema=jsonschema_obj)
@@ -3,11 +3,15 @@
 """Test serialization."""
 
 import importlib
+import json
 import os
+import sys
 import tempfile
 import unittest
+from unittest import mock
 
-from acsets import ACSet, Attr, AttrType, Hom, Ob, mira, petris
+from acsets import ACSet, Attr, AttrType, Hom, Ob, Schema, mira, petris
+from acsets import acsets as acsets_module
 
 PYDANTIC_1 = importlib.metadata.version("pydantic").startswith("1.")
 
@@ -24,33 +28,38 @@ class TestSerialization(unittest.TestCase):
             schema.schema.Attr,
             schema.schema.AttrType,
         ]:
-            for elements in elements:
-                self.assertIsNotNone(elements.name)
-                self.assertIsNotNone(elements.title)
+            for element in elements:
+                self.assertIsNotNone(element.name)
+                self.assertIsNotNone(element.title)
 
     def test_serialization(self):
         """Test serialization round trip."""
+        self.assertTrue(issubclass(mira.MiraNet, petris.Petri))
         for cls_name, cls, schema in [
             ("Petri", petris.Petri, petris.SchPropertyLabelledReactionNet),
             ("MiraNet", mira.MiraNet, mira.SchMira),
         ]:
-            sir = cls()
-            self.assertIsInstance(sir, petris.Petri)
-            s, i, r = sir.add_species(3)
-            inf, rec = sir.add_transitions([([s, i], [i, i]), ([i], [r])])
-
-            pd_sir = sir.export_pydantic()
-            self.assertEqual(pd_sir.S[1].id_field_internal, 2)
-            serialized = sir.to_json_str()
-            deserialized = cls.import_pydantic(cls_name, schema, pd_sir)
-            pd_sir2 = deserialized.export_pydantic()
-            reserialized = deserialized.to_json_str()
-            deserialized2 = cls.read_json(cls_name, schema, reserialized)
-            rereserialized = deserialized2.to_json_str()
-
-            self.assertEqual(pd_sir2, pd_sir)
-            self.assertEqual(serialized, reserialized)
-            self.assertEqual(reserialized, rereserialized)
+            with self.subTest(cls=cls_name):
+                sir = cls()
+                s, i, r = sir.add_species(3)
+                inf, rec = sir.add_transitions([([s, i], [i, i]), ([i], [r])])
+
+                pd_sir = sir.export_pydantic()
+                self.assertEqual(pd_sir.S[1].id_field_internal, 2)
+                self.assertEqual(pd_sir.dict(by_alias=True), sir.to_json_obj())
+                self.assertEqual(schema.model.parse_obj(sir.to_json_obj()), pd_sir)
+                serialized = sir.to_json_str()
+                from_obj = cls.from_json_obj(cls_name, schema, json.loads(serialized))
+                self.assertEqual(serialized, from_obj.to_json_str())
+                deserialized = cls.import_pydantic(cls_name, schema, pd_sir)
+                pd_sir2 = deserialized.export_pydantic()
+                reserialized = deserialized.to_json_str()
+                deserialized2 = cls.read_json(cls_name, schema, reserialized)
+                rereserialized = deserialized2.to_json_str()
+
+                self.assertEqual(pd_sir2, pd_sir)
+                self.assertEqual(serialized, reserialized)
+                self.assertEqual(reserialized, rereserialized)
 
     def test_ob(self):
         """Test instantiating a hom."""
@@ -59,6 +68,90 @@ class TestSerialization(unittest.TestCase):
         self.assertIsInstance(hom1.dom, str)
         self.assertIsInstance(hom1.codom, str)
 
+    def test_json_file(self):
+        """Test writing an ACSet to a JSON file and reading it back."""
+        sir = petris.Petri()
+        s, i, r = sir.add_species(3)
+        sir.set_subpart(s, petris.attr_sname, "susceptible")
+        sir.add_transitions([([s, i], [i, i]), ([i], [r])])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sir.json")
+            sir.to_json_file(path)
+            with open(path) as file:
+                text = file.read()
+        self.assertEqual(sir.to_json_str(), text)
+        schema = petris.SchPropertyLabelledReactionNet
+        self.assertEqual(text, petris.Petri.read_json("Petri", schema, text).to_json_str())
+
+    def test_special_numbers(self):
+        """Test that NaN, infinite floats and big integers serialize with or without orjson."""
+        sir = petris.Petri()
+        s, i = sir.add_species(2)
+        sir.set_subpart(s, petris.attr_concentration, float("nan"))
+        sir.set_subpart(i, petris.attr_concentration, float("inf"))
+        sir.set_subpart(s, petris.attr_sprop, {"count": 2**70})
+        for has_orjson in (True, False):
+            with self.subTest(has_orjson=has_orjson):
+                if has_orjson and acsets_module.orjson is None:
+                    self.skipTest("orjson is not installed")
+                with mock.patch.object(
+                    acsets_module, "orjson", acsets_module.orjson if has_orjson else None
+                ):
+                    serialized = sir.to_json_str()
+                    schema = petris.SchPropertyLabelledReactionNet
+                    read = petris.Petri.read_json("Petri", schema, serialized)
+                self.assertEqual(json.dumps(sir.to_json_obj(), separators=(",", ":")), serialized)
+                self.assertIn("NaN", serialized)
+                self.assertIn("Infinity", serialized)
+                self.assertIn(str(2**70), serialized)
+                self.assertEqual(serialized, read.to_json_str())
+                self.assertEqual({"count": 2**70}, read.subpart(s, petris.attr_sprop))
+
+    def test_pydantic_options(self):
+        """Test that serialization options are passed on to the pydantic model."""
+        sir = petris.Petri()
+        s, i = sir.add_species(2)
+        sir.set_subpart(s, petris.attr_sname, "susceptible")
+        obj = json.loads(sir.to_json_str(exclude_none=True))
+        self.assertEqual([{"_id": 1, "sname": "susceptible"}, {"_id": 2}], obj["S"])
+        obj = json.loads(sir.to_json_str(exclude={"T"}))
+        self.assertNotIn("T", obj)
+        self.assertIn("S", obj)
+        self.assertEqual(sir.to_json_str(), sir.to_json_str(exclude_none=False))
+
+    def test_exclude_unset(self):
+        """Test that only the properties set on a row count as set in its model."""
+        sir = petris.Petri()
+        s, i = sir.add_species(2)
+        sir.set_subpart(s, petris.attr_sname, "susceptible")
+        pd_sir = sir.export_pydantic()
+        self.assertEqual({"id_field_internal"}, pd_sir.S[1].__fields_set__)
+        self.assertEqual({"id_field_internal", "sname"}, pd_sir.S[0].__fields_set__)
+        obj = json.loads(sir.to_json_str(exclude_unset=True))
+        self.assertEqual([{"_id": 1, "sname": "susceptible"}, {"_id": 2}], obj["S"])
+        self.assertEqual(sir.to_json_obj(), pd_sir.dict(by_alias=True))
+
+    def test_non_json_types(self):
+        """Test that attributes without a JSON type are encoded like pydantic does."""
+        ob = Ob(name="X")
+        tags, blob = AttrType(name="Tags", ty=set), AttrType(name="Blob", ty=bytes)
+        attr_tags = Attr(name="tags", dom=ob, codom=tags)
+        attr_blob = Attr(name="blob", dom=ob, codom=blob)
+        schema = Schema("Tagged", [ob], [], [tags, blob], [attr_tags, attr_blob])
+        acs = ACSet("Tagged", schema)
+        x = acs.add_part(ob)
+        acs.set_subpart(x, attr_tags, {1})
+        acs.set_subpart(x, attr_blob, b"hi")
+        expected = [{"_id": 1, "tags": [1], "blob": "hi"}]
+        for has_orjson in (True, False):
+            with self.subTest(has_orjson=has_orjson):
+                if has_orjson and acsets_module.orjson is None:
+                    self.skipTest("orjson is not installed")
+                with mock.patch.object(
+                    acsets_module, "orjson", acsets_module.orjson if has_orjson else None
+                ):
+                    self.assertEqual(expected, json.loads(acs.to_json_str())["X"])
+
     @unittest.skipUnless(
         PYDANTIC_1, reason="This functionality can not be made cross-compatible AFAIK"
     )
@@ -67,3 +160,74 @@ class TestSerialization(unittest.TestCase):
         with tempfile.TemporaryDirectory() as directory:
             path = os.path.join(directory, "petri.json")
             petris.SchPropertyLabelledReactionNet.write_schema(path)
+
+
+class TestSubparts(unittest.TestCase):
+    """A test case for getting and setting subparts."""
+
+    def test_set_unset(self):
+        """Test that subparts can be set, read back, and cleared."""
+        sir = petris.Petri()
+        s, i, r = sir.add_species(3)
+        sir.add_transitions([([s, i], [i, i])])
+        arc = 0
+        self.assertEqual(s, sir.subpart(arc, petris.hom_is))
+        self.assertEqual(s + 1, sir.subpart(arc, petris.hom_is, oneindex=True))
+
+        self.assertFalse(sir.has_subpart(s, petris.attr_sname))
+        sir.set_subpart(s, petris.attr_sname, "susceptible")
+        self.assertEqual("susceptible", sir.subpart(s, petris.attr_sname))
+        sir.set_subpart(s, petris.attr_sname, None)
+        self.assertFalse(sir.has_subpart(s, petris.attr_sname))
+        self.assertRaises(KeyError, sir.subpart, s, petris.attr_sname)
+
+        sir.set_subpart(arc, petris.hom_is, None)
+        self.assertFalse(sir.has_subpart(arc, petris.hom_is))
+        self.assertNotIn("is", sir.prop_dict(petris.Input, arc))
+
+    def test_out_of_range(self):
+        """Test that negative morphism values and rows outside the domain are rejected."""
+        sir = petris.Petri()
+        s, i = sir.add_species(2)
+        sir.add_transitions([([s], [i])])
+        self.assertRaises(ValueError, sir.set_subpart, 0, petris.hom_is, -1)
+        self.assertRaises(IndexError, sir.set_subpart, -1, petris.hom_is, s)
+        self.assertRaises(IndexError, sir.set_subpart, 2, petris.attr_sname, "recovered")
+        self.assertFalse(sir.has_subpart(-1, petris.attr_sname))
+        self.assertRaises(KeyError, sir.subpart, -1, petris.hom_is)
+
+    def test_failed_set_leaves_acset_unchanged(self):
+        """Test that a rejected value does not modify the column or its index."""
+        sir = petris.Petri()
+        s, i = sir.add_species(2)
+        sir.add_transitions([([s, i], [i])])
+        self.assertRaises(AssertionError, sir.set_subpart, 0, petris.hom_is, "bad")
+        self.assertRaises(ValueError, sir.set_subparts, [0, 1], petris.hom_is, [i, -1])
+        self.assertRaises(ValueError, sir.set_subparts, [0, 1], petris.hom_is, [i])
+        self.assertRaises(ValueError, sir.set_subpart, 0, petris.hom_is, 2)
+        self.assertRaises(ValueError, sir.set_subpart, 0, petris.hom_is, 2**63)
+        self.assertEqual(s, sir.subpart(0, petris.hom_is))
+        self.assertEqual([0], sir.incident(s, petris.hom_is))
+        self.assertEqual([1], sir.incident(i, petris.hom_is))
+        sir.set_subpart(0, petris.hom_is, i)
+        self.assertEqual([0, 1], sir.incident(i, petris.hom_is))
+
+    def test_incident(self):
+        """Test finding the parts incident to a subpart."""
+        sir = petris.Petri()
+        s, i, r = sir.add_species(3)
+        inf, rec = sir.add_transitions([([s, i], [i, i]), ([i], [r])])
+        self.assertEqual([0, 1], sir.incident(inf, petris.hom_it))
+        self.assertEqual([2], sir.incident(rec, petris.hom_it))
+        self.assertEqual([1, 2], sir.incident(i, petris.hom_is))
+        self.assertEqual([], sir.incident(s, petris.hom_os))
+
+        sir.set_subpart(r, petris.attr_sname, "".join(["re", "covered"]))
+        self.assertIs(sys.intern("recovered"), sir.subpart(r, petris.attr_sname))
+        self.assertEqual([r], sir.incident("recovered", petris.attr_sname))
+
+        sir.set_subpart(0, petris.hom_it, rec)
+        self.assertEqual([1], sir.incident(inf, petris.hom_it))
+        self.assertEqual([0, 2], sir.incident(rec, petris.hom_it))
+        sir.set_subpart(2, petris.hom_it, None)
+        self.assertEqual([0], sir.incident(rec, petris.hom_it))
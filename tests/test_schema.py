@@ -1,19 +1,36 @@
 """Tests for schema."""
 
+import importlib
 import json
 import tempfile
 import unittest
 from pathlib import Path
 
-from acsets import CATLAB_SCHEMAS_DIRECTORY, ACSet, Attr, AttrType, CatlabSchema, Hom, Ob, petris
+from acsets import (
+    CATLAB_SCHEMAS_DIRECTORY,
+    ACSet,
+    Attr,
+    AttrType,
+    CatlabSchema,
+    Hom,
+    Ob,
+    Schema,
+    petris,
+)
 
 TESTING_SCHEMA = petris.SchPropertyLabelledReactionNet
+PYDANTIC_1 = importlib.metadata.version("pydantic").startswith("1.")
 PETRI_SCHEMA_PATH = CATLAB_SCHEMAS_DIRECTORY.joinpath("{}.json".format(TESTING_SCHEMA.name))
 
 
 class TestSchema(unittest.TestCase):
     """Tests for the schema."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Serialize the testing schema once for the tests that need its JSON."""
+        cls.schema_json = TESTING_SCHEMA.schema.json()
+
     def test_hom(self):
         """Test transforming Ob objects when instantiating a Hom."""
         ob_transition = Ob(name="T", title="Transition")
@@ -37,25 +54,93 @@ class TestSchema(unittest.TestCase):
         )
         self.assertEqual(ob_species.name, attr_sname.dom)
 
+    def test_str_subclass_name(self):
+        """Test that names given as a subclass of str are accepted and interned."""
+
+        class Name(str):
+            pass
+
+        ob = Ob(name=Name("S"))
+        self.assertIs(type(ob.name), str)
+        self.assertEqual(Ob(name="S"), ob)
+
+    def test_duplicate_property(self):
+        """Test that a schema rejects a morphism and an attribute with the same name."""
+        ob_species = Ob(name="S", title="Species")
+        attr_type_name = AttrType(name="Name", ty=str, title="Name")
+        hom_name = Hom(name="name", dom=ob_species, codom=ob_species)
+        attr_name = Attr(name="name", dom=ob_species, codom=attr_type_name)
+        with self.assertRaises(ValueError):
+            Schema("Bad", [ob_species], [hom_name], [attr_type_name], [attr_name])
+        with self.assertRaises(ValueError):
+            Schema("Bad", [ob_species], [hom_name, hom_name], [], [])
+
+    def test_hash(self):
+        """Test that caching the hash of a schema element does not affect equality."""
+        ob = Ob(name="S", title="Species")
+        self.assertEqual(hash(Ob(name="S", title="Species")), hash(ob))
+        self.assertEqual(Ob(name="S", title="Species"), ob)
+        self.assertNotEqual(Ob(name="S"), ob)
+        self.assertEqual({ob: 1}, {Ob(name="S", title="Species"): 1})
+
+        catlab_schema = TESTING_SCHEMA.schema
+        self.assertEqual(hash(CatlabSchema.parse_obj(catlab_schema.dict())), hash(catlab_schema))
+
+    def test_hash_after_copy(self):
+        """Test that a copy with updated fields does not keep the cached hash."""
+        ob = Ob(name="S")
+        hash(ob)
+        copied = ob.copy(update={"title": "Species"})
+        self.assertEqual(hash(Ob(name="S", title="Species")), hash(copied))
+        self.assertEqual(1, {Ob(name="S", title="Species"): 1}.get(copied))
+        if hasattr(ob, "model_copy"):
+            copied = ob.model_copy(update={"title": "Species"})
+            self.assertEqual(hash(Ob(name="S", title="Species")), hash(copied))
+
+    def test_from_string(self):
+        """Test looking up schema elements by name."""
+        self.assertEqual(petris.Species, TESTING_SCHEMA.from_string("S"))
+        self.assertEqual(petris.hom_it, TESTING_SCHEMA.from_string("it"))
+        self.assertEqual(petris.Name, TESTING_SCHEMA.from_string("Name"))
+        self.assertEqual(petris.attr_sname, TESTING_SCHEMA.from_string("sname"))
+        self.assertIsNone(TESTING_SCHEMA.from_string("nonexistent"))
+
+    def test_models_shared(self):
+        """Test that schemas with the same signature share their pydantic models."""
+        schema = Schema.from_catlab(TESTING_SCHEMA.name, TESTING_SCHEMA.schema)
+        self.assertIs(TESTING_SCHEMA.model, schema.model)
+        self.assertIs(TESTING_SCHEMA.ob_models[petris.Species], schema.ob_models[petris.Species])
+        other = Schema.from_catlab("Other", TESTING_SCHEMA.schema)
+        self.assertIsNot(TESTING_SCHEMA.model, other.model)
+
+    @unittest.skipUnless(
+        PYDANTIC_1, reason="This functionality can not be made cross-compatible AFAIK"
+    )
+    def test_make_schema_shared_model(self):
+        """Test that making a JSON schema does not change the one of a schema sharing its model."""
+        TESTING_SCHEMA.make_schema(uri="https://example.com/petri.json")
+        schema = Schema.from_catlab(TESTING_SCHEMA.name, TESTING_SCHEMA.schema)
+        self.assertNotIn("$id", schema.make_schema())
+
     def test_loading(self):
         """Test loading a schema from a JSON file."""
         schema = CatlabSchema.parse_file(PETRI_SCHEMA_PATH)
         self.assertEqual(
-            TESTING_SCHEMA.schema.json(),
+            self.schema_json,
             schema.json(),
         )
 
     def test_writing(self):
         """Test writing a schema works as expected."""
-        expected = json.loads(PETRI_SCHEMA_PATH.read_text())
-        actual = json.loads(TESTING_SCHEMA.schema.json())
+        expected = json.loads(PETRI_SCHEMA_PATH.read_bytes())
+        actual = json.loads(self.schema_json)
         self.assertEqual(expected, actual)
 
     def test_round_trip(self):
         """Test writing, reading, then instantiating."""
         with tempfile.TemporaryDirectory() as directory:
             path = Path(directory).resolve().joinpath("petri.json")
-            path.write_text(TESTING_SCHEMA.schema.json())
+            path.write_text(self.schema_json)
             sir = ACSet.from_file(name="petri", path=path)
             s, i, r = sir.add_parts("S", 3)
             self.assertIsInstance(s, int)